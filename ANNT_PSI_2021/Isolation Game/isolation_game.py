@@ -1,13 +1,290 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from numba import njit
+import numpy as np
 import argparse
+import threading
+import time
+
+WIN_SCORE = 9999
+INFINITY = 1 << 30
+
+# Bound types of transposition table entries
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Columns of the transposition table array
+TT_KEY, TT_DEPTH, TT_VALUE, TT_BOUND, TT_MOVE = 0, 1, 2, 3, 4
+
+KNIGHT_MOVES = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+
+
+def build_neighbors(board_size):
+    """
+    Compute the squares reachable with a knight move from every square of a board.
+
+    Parameters:
+    - board_size (int): Width and height of the board.
+
+    Returns:
+    tuple: Tuple of tuples, the square indices x * board_size + y reachable from every square.
+    """
+    neighbors = []
+    for sq in range(board_size * board_size):
+        x, y = divmod(sq, board_size)
+        neighbors.append(
+            tuple(
+                (x + dx) * board_size + y + dy
+                for dx, dy in KNIGHT_MOVES
+                if 0 <= x + dx < board_size and 0 <= y + dy < board_size
+            )
+        )
+    return tuple(neighbors)
+
+
+def build_neighbor_table(neighbors):
+    """
+    Convert neighbor lists to the fixed-shape arrays used by the search kernel.
+
+    Parameters:
+    - neighbors (sequence): Square indices reachable from every square.
+
+    Returns:
+    tuple: (squares, 8) int8 array of neighbors padded with -1, and int8 array of neighbor counts.
+    """
+    table = np.full((len(neighbors), 8), -1, dtype=np.int8)
+    counts = np.zeros(len(neighbors), dtype=np.int8)
+    for sq, squares in enumerate(neighbors):
+        table[sq, : len(squares)] = squares
+        counts[sq] = len(squares)
+    return table, counts
+
+
+# The game is played on an 8x8 board, so its move tables are built once at import
+NEIGHBORS_8x8 = build_neighbors(8)
+NEIGHBOR_MASKS_8x8 = tuple(sum(1 << n for n in squares) for squares in NEIGHBORS_8x8)
+NEIGHBOR_TABLE_8x8, NEIGHBOR_COUNTS_8x8 = build_neighbor_table(NEIGHBORS_8x8)
+
+
+@njit(cache=True, nogil=True)
+def _mobility(board, sq, neighbors, counts):
+    """
+    Count the unvisited squares a knight can jump to from a square.
+
+    Parameters:
+    - board: Flat int8 array with 1 for every visited square.
+    - sq: Square index of the knight.
+    - neighbors: int8 array (squares, 8) of knight neighbors, padded with -1.
+    - counts: int8 array with the number of neighbors of every square.
+
+    Returns:
+    - Number of legal moves from the square.
+    """
+    mobility = 0
+    for i in range(counts[sq]):
+        if board[neighbors[sq, i]] == 0:
+            mobility += 1
+    return mobility
+
+
+@njit(cache=True, nogil=True)
+def _is_neighbor(sq, other, neighbors, counts):
+    """
+    Check whether two squares are a knight move apart.
+
+    Parameters:
+    - sq: Square index.
+    - other: Square index.
+    - neighbors: int8 array (squares, 8) of knight neighbors, padded with -1.
+    - counts: int8 array with the number of neighbors of every square.
+
+    Returns:
+    - True if a knight on sq can jump to other.
+    """
+    for i in range(counts[sq]):
+        if neighbors[sq, i] == other:
+            return True
+    return False
+
+
+@njit(cache=True, nogil=True)
+def _alphabeta(
+    board,
+    me_sq,
+    opp_sq,
+    depth,
+    alpha,
+    beta,
+    maximizing,
+    h,
+    neighbors,
+    counts,
+    zobrist,
+    zobrist_side,
+    tt,
+):
+    """
+    Evaluate a position with minimax search and alpha-beta pruning.
+
+    The agent's knight is the maximizing player and the opponent's knight the minimizing one.
+    Moves are made on the board array and undone after the recursive call. Children are
+    ordered by Warnsdorff degree, ascending for the agent and descending for the opponent,
+    with the transposition table move searched first.
+
+    Parameters:
+    - board: Flat int8 array with 1 for every visited square.
+    - me_sq: Square index of the agent's knight.
+    - opp_sq: Square index of the opponent's knight.
+    - depth: Remaining depth of the search in plies.
+    - alpha: Lower bound on the score the agent is already assured of.
+    - beta: Upper bound on the score the opponent is already assured of.
+    - maximizing: True if it is the agent's turn to move.
+    - h: Zobrist hash of the position.
+    - neighbors: int8 array (squares, 8) of knight neighbors, padded with -1.
+    - counts: int8 array with the number of neighbors of every square.
+    - zobrist: int64 array (3, squares) of keys for visited squares, the agent's knight and the opponent's knight.
+    - zobrist_side: int64 key xored in when the opponent is to move.
+    - tt: int64 transposition table array (size, 5) indexed by h & (size - 1).
+
+    Returns:
+    - Score of the position from the agent's point of view.
+    """
+    if depth == 0:
+        return _mobility(board, me_sq, neighbors, counts) - _mobility(
+            board, opp_sq, neighbors, counts
+        )
+
+    index = h & (tt.shape[0] - 1)
+    hash_move = -1
+    if tt[index, TT_DEPTH] >= 0 and tt[index, TT_KEY] == h:
+        hash_move = tt[index, TT_MOVE]
+        if tt[index, TT_DEPTH] >= depth:
+            value = tt[index, TT_VALUE]
+            bound = tt[index, TT_BOUND]
+            if bound == EXACT:
+                return value
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+    if maximizing:
+        mover_sq, other_sq = me_sq, opp_sq
+    else:
+        mover_sq, other_sq = opp_sq, me_sq
+
+    # Legal moves with their degrees, kept sorted by insertion
+    moves = np.empty(8, np.int64)
+    degrees = np.empty(8, np.int64)
+    n = 0
+    for i in range(counts[mover_sq]):
+        move = neighbors[mover_sq, i]
+        if board[move] != 0:
+            continue
+        degree = _mobility(board, move, neighbors, counts)
+        j = n
+        while j > 0 and (
+            degrees[j - 1] > degree if maximizing else degrees[j - 1] < degree
+        ):
+            moves[j] = moves[j - 1]
+            degrees[j] = degrees[j - 1]
+            j -= 1
+        moves[j] = move
+        degrees[j] = degree
+        n += 1
+
+    if n == 0:
+        # The side to move is isolated
+        return -WIN_SCORE if maximizing else WIN_SCORE
+
+    for i in range(n):
+        if moves[i] == hash_move:
+            degree = degrees[i]
+            for j in range(i, 0, -1):
+                moves[j] = moves[j - 1]
+                degrees[j] = degrees[j - 1]
+            moves[0] = hash_move
+            degrees[0] = degree
+            break
+
+    if depth == 1:
+        other_mobility = _mobility(board, other_sq, neighbors, counts)
+
+    alpha_orig, beta_orig = alpha, beta
+    best_move = -1
+    value = -INFINITY if maximizing else INFINITY
+    for i in range(n):
+        move = moves[i]
+        if depth == 1:
+            # Leaf score from the cached degree, the move only takes a square from the other knight
+            remaining = other_mobility
+            if _is_neighbor(other_sq, move, neighbors, counts):
+                remaining -= 1
+            if maximizing:
+                move_value = degrees[i] - remaining
+            else:
+                move_value = remaining - degrees[i]
+        else:
+            board[move] = 1
+            if maximizing:
+                child_h = h ^ zobrist[0, move] ^ zobrist[1, me_sq] ^ zobrist[1, move]
+                child_me_sq, child_opp_sq = move, opp_sq
+            else:
+                child_h = h ^ zobrist[0, move] ^ zobrist[2, opp_sq] ^ zobrist[2, move]
+                child_me_sq, child_opp_sq = me_sq, move
+            # Single call site with a non-literal flag keeps one compiled specialization,
+            # recursive functions with several of them cannot be loaded back from the cache
+            move_value = _alphabeta(
+                board,
+                child_me_sq,
+                child_opp_sq,
+                depth - 1,
+                alpha,
+                beta,
+                not maximizing,
+                child_h ^ zobrist_side,
+                neighbors,
+                counts,
+                zobrist,
+                zobrist_side,
+                tt,
+            )
+            board[move] = 0
+
+        if maximizing:
+            if move_value > value:
+                value = move_value
+                best_move = move
+            alpha = max(alpha, value)
+        else:
+            if move_value < value:
+                value = move_value
+                best_move = move
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+
+    if value <= alpha_orig:
+        bound = UPPER
+    elif value >= beta_orig:
+        bound = LOWER
+    else:
+        bound = EXACT
+    tt[index, TT_KEY] = h
+    tt[index, TT_DEPTH] = depth
+    tt[index, TT_VALUE] = value
+    tt[index, TT_BOUND] = bound
+    tt[index, TT_MOVE] = best_move
+    return value
 
 
 class KnightAgent:
     """AI Agent for playing as the knight in the Isolation Game."""
 
-    def __init__(self, game, knight_number, lookahead_depth=2):
+    def __init__(
+        self, game, knight_number, lookahead_depth=2, tt_size=1 << 16, time_limit=None
+    ):
         """
         Initialize the KnightAgent.
 
@@ -15,113 +292,198 @@ class KnightAgent:
         - game: Instance of the IsolationKnightGame.
         - knight_number: Integer, indicating which knight the agent is playing (1 or 2).
         - lookahead_depth: Depth to look ahead when evaluating moves. Defaults to 2.
+        - tt_size: Number of transposition table slots, must be a power of two. Defaults to 2**16.
+        - time_limit: Seconds after which iterative deepening stops starting deeper searches. Defaults to None (no limit).
         """
         self.game = game
         self.knight_number = knight_number
         self.lookahead_depth = lookahead_depth
+        self.time_limit = time_limit
+        self.pv_move = None
+
+        # Neighbor table in the fixed-shape layout used by the search kernel
+        squares = game.board_size * game.board_size
+        if game.board_size == 8:
+            self.neighbors, self.counts = NEIGHBOR_TABLE_8x8, NEIGHBOR_COUNTS_8x8
+        else:
+            self.neighbors, self.counts = build_neighbor_table(game.neighbors)
+
+        # Zobrist keys for visited squares, the agent's and the opponent's knight, and the side to move
+        rng = np.random.default_rng()
+        int64 = np.iinfo(np.int64)
+        self.zobrist = rng.integers(int64.min, int64.max, size=(3, squares), dtype=np.int64)
+        self.zobrist_side = int(rng.integers(int64.min, int64.max, dtype=np.int64))
+
+        # Rows are (hash, depth, value, bound, best_move); depth -1 marks an empty slot.
+        # The table is kept between moves.
+        self.transposition_table = np.zeros((tt_size, 5), dtype=np.int64)
+        self.transposition_table[:, TT_DEPTH] = -1
+
+    def compute_hash(self, knight_sq, opp_sq):
+        """
+        Compute the Zobrist hash of the current game state with the agent to move.
 
-    def get_legal_moves(self, position):
+        Parameters:
+        - knight_sq: Square index of the agent's knight.
+        - opp_sq: Square index of the opponent's knight.
+
+        Returns:
+        - Integer hash of the visited squares and both knights' positions.
         """
-        Returns all legal moves from the current position.
+        h = 0
+        visited_bb = self.game.visited_bb
+        while visited_bb:
+            lsb = visited_bb & -visited_bb
+            h ^= int(self.zobrist[0, lsb.bit_length() - 1])
+            visited_bb ^= lsb
+        return h ^ int(self.zobrist[1, knight_sq]) ^ int(self.zobrist[2, opp_sq])
+
+    def get_legal_moves_fast(self, square):
+        """
+        Returns all legal moves from a square using the game's precomputed neighbor table.
 
         Parameters:
-        - position: Tuple (x,y) representing the current position.
+        - square: Square index (x * board_size + y) of the current position.
 
         Returns:
-        - List of tuples representing legal moves from the position.
+        - List of square indices of the legal moves from the position.
         """
-        moves = [
-            (position[0] + move[0], position[1] + move[1])
-            for move in self.game.knight_moves
-        ]
-        legal_moves = [
-            move
-            for move in moves
-            if 0 <= move[0] < self.game.board_size
-            and 0 <= move[1] < self.game.board_size
-            and self.game.visited[move[0]][move[1]] == 0
-        ]
-        return legal_moves
+        visited_bb = self.game.visited_bb
+        return [s for s in self.game.neighbors[square] if not (visited_bb >> s) & 1]
 
-    def warnsdorffs_rule(self, position):
+    def mobility(self, square):
+        """
+        Count the legal moves from a square.
+
+        Parameters:
+        - square: Square index of the position.
+
+        Returns:
+        - Number of unvisited squares a knight can jump to from the position.
+        """
+        return (self.game.knight_attacks[square] & ~self.game.visited_bb).bit_count()
+
+    def warnsdorffs_rule(self, position, first=None):
         """
         Get sorted legal moves based on Warnsdorff's rule.
 
         Parameters:
-        - position: Tuple (x,y) representing the current position.
+        - position: Square index of the current position.
+        - first: Move to search before all others if it is legal, e.g. the best move of a previous iteration. Defaults to None.
 
         Returns:
-        - List of sorted legal moves.
+        - List of legal moves sorted by the number of onward moves.
         """
-        legal_moves = self.get_legal_moves(position)
-        legal_moves.sort(key=lambda move: len(self.get_legal_moves(move)))
+        legal_moves = sorted(self.get_legal_moves_fast(position), key=self.mobility)
+        if first in legal_moves:
+            legal_moves.remove(first)
+            legal_moves.insert(0, first)
         return legal_moves
 
-    def evaluate_position(self, position, depth):
+    def choose_move(self):
         """
-        Evaluate a position's desirability using a recursive search.
+        Find the best move for the agent's knight using iterative deepening alpha-beta search.
 
-        Parameters:
-        - position: Tuple (x,y) representing the current position.
-        - depth: Depth of the recursive search.
+        Each iteration searches the best move of the previous one first. If a time limit is set,
+        the move found by the last completed iteration is returned once it is exceeded. Only the
+        game state is read, so this can run outside the Tk thread.
 
         Returns:
-        - Average score of all moves from the position.
+        - Square index of the best move, or None if the knight has no legal moves.
         """
-        if depth == 0:
-            return len(self.get_legal_moves(position))
+        if self.knight_number == 1:
+            knight_pos, opp_pos = self.game.knight1_position, self.game.knight2_position
+        else:
+            knight_pos, opp_pos = self.game.knight2_position, self.game.knight1_position
+        knight_sq, opp_sq = self.game.square(knight_pos), self.game.square(opp_pos)
+
+        board = np.zeros(len(self.counts), dtype=np.int8)
+        for sq in range(len(board)):
+            board[sq] = (self.game.visited_bb >> sq) & 1
+
+        start_time = time.time()
+        h = self.compute_hash(knight_sq, opp_sq)
+        self.pv_move = None
+        for depth in range(1, self.lookahead_depth + 1):
+            best_move = None
+            best_value = -INFINITY
+            for move in self.warnsdorffs_rule(knight_sq, first=self.pv_move):
+                child_h = (
+                    h
+                    ^ int(self.zobrist[0, move])
+                    ^ int(self.zobrist[1, knight_sq])
+                    ^ int(self.zobrist[1, move])
+                    ^ self.zobrist_side
+                )
+                board[move] = 1
+                move_value = _alphabeta(
+                    board,
+                    move,
+                    opp_sq,
+                    depth - 1,
+                    best_value,
+                    INFINITY,
+                    False,
+                    child_h,
+                    self.neighbors,
+                    self.counts,
+                    self.zobrist,
+                    self.zobrist_side,
+                    self.transposition_table,
+                )
+                board[move] = 0
+                if move_value > best_value:
+                    best_value = move_value
+                    best_move = move
+            self.pv_move = best_move
 
-        possible_moves = self.warnsdorffs_rule(position)
-        if not possible_moves:
-            return -9999  # No legal moves, very undesirable
+            if (
+                self.time_limit is not None
+                and time.time() - start_time >= self.time_limit
+            ):
+                break
 
-        scores = [self.evaluate_position(move, depth - 1) for move in possible_moves]
-        return sum(scores) / len(scores)
+        return self.pv_move
 
     def make_move(self):
         """
-        Make the best move for the agent's knight based on the evaluation function.
-        
+        Make the best move for the agent's knight.
+
         Returns:
         None
         """
-        knight_pos = (
-            self.game.knight1_position
-            if self.knight_number == 1
-            else self.game.knight2_position
-        )
-        best_move = None
-        best_value = -9999
-        for move in self.warnsdorffs_rule(knight_pos):
-            move_value = self.evaluate_position(move, self.lookahead_depth)
-            if move_value >= best_value:
-                best_value = move_value
-                best_move = move
-
-        if best_move:
-            self.game.on_square_click(best_move[0], best_move[1])
-
+        move = self.choose_move()
+        if move is not None:
+            self.game.play_move(*divmod(move, self.game.board_size))
 
 
 class IsolationKnightGame:
     """Main game class for the Isolation Knight Game."""
 
     def __init__(
-        self, root, knight1_start=(0, 0), knight2_start=(7, 7), use_agent=False
+        self,
+        root,
+        knight1_start=(0, 0),
+        knight2_start=(7, 7),
+        use_agent=False,
+        headless=False,
     ):
         """
         Initialize the game and set up the board.
 
         Parameters:
-        - root (tk.Tk): The main tkinter root window.
+        - root (tk.Tk): The main tkinter root window, unused in headless mode.
         - knight1_start (tuple): Tuple containing the starting coordinates of knight1. Defaults to (0,0).
         - knight2_start (tuple): Tuple containing the starting coordinates of knight2. Defaults to (7,7).
         - use_agent (bool): If True, knight2 will be controlled by an AI agent.
+        - headless (bool): If True, only the game state is kept and no GUI is created. Defaults to False.
 
         Returns:
         None
         """
         self.root = root
+        self.headless = headless
+        self.winner = None
         self.board_size = 8
         self.board = [
             [None for _ in range(self.board_size)] for _ in range(self.board_size)
@@ -130,16 +492,7 @@ class IsolationKnightGame:
             [0 for _ in range(self.board_size)] for _ in range(self.board_size)
         ]
 
-        self.knight_moves = [
-            (2, 1),
-            (1, 2),
-            (-1, 2),
-            (-2, 1),
-            (-2, -1),
-            (-1, -2),
-            (1, -2),
-            (2, -1),
-        ]
+        self.knight_moves = KNIGHT_MOVES
 
         self.current_knight = 1  # Start with knight1
 
@@ -148,8 +501,29 @@ class IsolationKnightGame:
         self.visited[self.knight1_position[0]][self.knight1_position[1]] = 1
         self.visited[self.knight2_position[0]][self.knight2_position[1]] = 2
 
-        self.create_board()
+        # Squares reachable with a knight move from every square, the 8x8 tables are shared
+        if self.board_size == 8:
+            self.neighbors = NEIGHBORS_8x8
+            self.knight_attacks = NEIGHBOR_MASKS_8x8
+        else:
+            self.neighbors = build_neighbors(self.board_size)
+            self.knight_attacks = [
+                self.compute_knight_mask(sq)
+                for sq in range(self.board_size * self.board_size)
+            ]
+
+        # Bit x * board_size + y is set for every visited square, the 2D list is kept for coloring
+        self.visited_bb = (1 << self.square(self.knight1_position)) | (
+            1 << self.square(self.knight2_position)
+        )
+
+        if headless:
+            self.knight1_image = self.knight2_image = None
+        else:
+            self.create_board()
 
+        # Set while the agent searches in a worker thread, clicks are ignored meanwhile
+        self.agent_thinking = False
         if use_agent:
             self.agent = KnightAgent(self, 2)
 
@@ -160,14 +534,21 @@ class IsolationKnightGame:
         Returns:
         None
         """
+        from PIL import Image, ImageTk
+
         image1 = Image.open("figs/white_knight.png")
         image2 = Image.open("figs/black_knight.png")
         self.knight1_image = ImageTk.PhotoImage(image1)
         self.knight2_image = ImageTk.PhotoImage(image2)
 
+        # Background color currently shown on every square, so only changed squares are repainted
+        self.current_colors = [
+            [self.determine_color(i, j) for j in range(self.board_size)]
+            for i in range(self.board_size)
+        ]
         for i in range(self.board_size):
             for j in range(self.board_size):
-                color = self.determine_color(i, j)
+                color = self.current_colors[i][j]
                 self.board[i][j] = tk.Label(self.root, bg=color, width=8, height=4)
                 self.board[i][j].grid(row=i, column=j)
                 self.board[i][j].bind(
@@ -181,6 +562,33 @@ class IsolationKnightGame:
             image=self.knight2_image, width=58, height=58, anchor="center"
         )
 
+    def square(self, position):
+        """
+        Convert board coordinates to a square index of the bitboards.
+
+        Parameters:
+        - position (tuple): Tuple containing the coordinates of a square.
+
+        Returns:
+        int: Square index x * board_size + y.
+        """
+        return position[0] * self.board_size + position[1]
+
+    def compute_knight_mask(self, sq):
+        """
+        Compute the bitboard of all squares a knight can jump to from a given square.
+
+        Parameters:
+        - sq (int): Square index of the knight.
+
+        Returns:
+        int: Bitboard with a bit set for every square reachable with a knight move.
+        """
+        mask = 0
+        for neighbor in self.neighbors[sq]:
+            mask |= 1 << neighbor
+        return mask
+
     def determine_color(self, i, j):
         """
         Determine the color of a given board square based on its state and position.
@@ -198,12 +606,26 @@ class IsolationKnightGame:
 
     def on_square_click(self, x, y):
         """
-        Handle a square being clicked by the user or AI, and perform game logic accordingly.
+        Handle a square being clicked by the user, ignoring clicks while the agent is thinking.
 
         Parameters:
         - x (int): Row index of the clicked square.
         - y (int): Column index of the clicked square.
 
+        Returns:
+        None
+        """
+        if not self.agent_thinking:
+            self.play_move(x, y)
+
+    def play_move(self, x, y):
+        """
+        Move the current knight to a square if the move is valid, and perform game logic accordingly.
+
+        Parameters:
+        - x (int): Row index of the target square.
+        - y (int): Column index of the target square.
+
         Returns:
         None
         """
@@ -212,23 +634,85 @@ class IsolationKnightGame:
                 self.move_knight(self.knight1_position, (x, y), self.knight1_image)
                 self.knight1_position = (x, y)
                 self.visited[x][y] = 1
+                self.visited_bb |= 1 << self.square((x, y))
+                self.update_square(x, y)
                 if not self.has_valid_moves(self.knight2_position):
-                    messagebox.showinfo("Game Over", "Knight 1 Wins!")
+                    self.end_game(1)
                     return
                 self.current_knight = 2
                 if hasattr(self, "agent"):
-                    self.agent.make_move()
+                    self.agent_thinking = True
+                    threading.Thread(target=self._agent_compute, daemon=True).start()
                     return
         elif self.current_knight == 2:
             if self.is_valid_move(self.knight2_position, (x, y)):
                 self.move_knight(self.knight2_position, (x, y), self.knight2_image)
                 self.knight2_position = (x, y)
                 self.visited[x][y] = 2
+                self.visited_bb |= 1 << self.square((x, y))
+                self.update_square(x, y)
                 if not self.has_valid_moves(self.knight1_position):
-                    messagebox.showinfo("Game Over", "Knight 2 Wins!")
+                    self.end_game(2)
                     return
                 self.current_knight = 1
-        self.update_board()
+
+    def end_game(self, winner):
+        """
+        Record the winner and announce it, in a message box or on stdout in headless mode.
+
+        Parameters:
+        - winner (int): Number of the winning knight (1 or 2).
+
+        Returns:
+        None
+        """
+        self.winner = winner
+        if self.headless:
+            print(f"Knight {winner} Wins!")
+        else:
+            messagebox.showinfo("Game Over", f"Knight {winner} Wins!")
+
+    def self_play(self, lookahead_depth=2):
+        """
+        Let two agents play against each other until the game is over.
+
+        Parameters:
+        - lookahead_depth (int): Search depth of both agents. Defaults to 2.
+
+        Returns:
+        int: Number of the winning knight (1 or 2).
+        """
+        agents = {
+            1: KnightAgent(self, 1, lookahead_depth),
+            2: KnightAgent(self, 2, lookahead_depth),
+        }
+        while self.winner is None:
+            agents[self.current_knight].make_move()
+        return self.winner
+
+    def _agent_compute(self):
+        """
+        Run the agent's search in a worker thread and hand the move back to the Tk thread.
+
+        Returns:
+        None
+        """
+        move = self.agent.choose_move()
+        self.root.after(0, lambda: self._apply_agent_move(move))
+
+    def _apply_agent_move(self, move):
+        """
+        Play the move found by the agent and accept clicks again.
+
+        Parameters:
+        - move (int): Square index of the agent's move, or None if it has no legal moves.
+
+        Returns:
+        None
+        """
+        self.agent_thinking = False
+        if move is not None:
+            self.play_move(*divmod(move, self.board_size))
 
     def has_valid_moves(self, position):
         """
@@ -240,15 +724,7 @@ class IsolationKnightGame:
         Returns:
         bool: True if there are valid moves available, False otherwise.
         """
-        for move in self.knight_moves:
-            next_move = (position[0] + move[0], position[1] + move[1])
-            if (
-                0 <= next_move[0] < self.board_size
-                and 0 <= next_move[1] < self.board_size
-                and self.visited[next_move[0]][next_move[1]] == 0
-            ):
-                return True
-        return False
+        return bool(self.knight_attacks[self.square(position)] & ~self.visited_bb)
 
     def is_valid_move(self, start, end):
         """
@@ -261,13 +737,8 @@ class IsolationKnightGame:
         Returns:
         bool: True if the move is valid, False otherwise.
         """
-        if (
-            end
-            in [(start[0] + move[0], start[1] + move[1]) for move in self.knight_moves]
-            and self.visited[end[0]][end[1]] == 0
-        ):
-            return True
-        return False
+        free_squares = self.knight_attacks[self.square(start)] & ~self.visited_bb
+        return bool((free_squares >> self.square(end)) & 1)
 
     def move_knight(self, start, end, image):
         """
@@ -281,22 +752,30 @@ class IsolationKnightGame:
         Returns:
         None
         """
+        if self.headless:
+            return
         self.board[start[0]][start[1]].config(image="", width=8, height=4)
         self.board[end[0]][end[1]].config(
             image=image, width=58, height=58, anchor="center"
         )
 
-    def update_board(self):
+    def update_square(self, i, j):
         """
-        Update the colors of the board squares and the positions of the knights on the GUI board.
+        Repaint a board square on the GUI board if its color changed.
+
+        Parameters:
+        - i (int): Row index of the square.
+        - j (int): Column index of the square.
 
         Returns:
         None
         """
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                color = self.determine_color(i, j)
-                self.board[i][j].config(bg=color)
+        if self.headless:
+            return
+        color = self.determine_color(i, j)
+        if color != self.current_colors[i][j]:
+            self.board[i][j].config(bg=color)
+            self.current_colors[i][j] = color
 
 
 parser = argparse.ArgumentParser(
@@ -317,15 +796,31 @@ parser.add_argument(
     help="Starting position for knight 2 in format: x y",
 )
 parser.add_argument("--agent", action="store_true", help="Use agent for knight 2")
+parser.add_argument(
+    "--headless",
+    action="store_true",
+    help="Play agent against agent without the GUI and print the winner",
+)
 
 args = parser.parse_args()
 
-root = tk.Tk()
-root.title("Isolation Knight Game")
-game = IsolationKnightGame(
-    root,
-    knight1_start=tuple(args.knight1),
-    knight2_start=tuple(args.knight2),
-    use_agent=args.agent,
-)
-root.mainloop()
+if args.headless:
+    game = IsolationKnightGame(
+        None,
+        knight1_start=tuple(args.knight1),
+        knight2_start=tuple(args.knight2),
+        headless=True,
+    )
+    start_time = time.time()
+    game.self_play()
+    print(f"Game took {time.time() - start_time:.2f} seconds")
+else:
+    root = tk.Tk()
+    root.title("Isolation Knight Game")
+    game = IsolationKnightGame(
+        root,
+        knight1_start=tuple(args.knight1),
+        knight2_start=tuple(args.knight2),
+        use_agent=args.agent,
+    )
+    root.mainloop()
@@ -1,6 +1,7 @@
-from collections import defaultdict
 import os
-from typing import List, Tuple, Optional
+from typing import List, Tuple
+from numba import njit
+import numpy as np
 from plot_knights_tour import plot_knight_tour
 import argparse
 
@@ -15,35 +16,6 @@ MOVE_OFFSETS = (
     (1, 2),
 )
 
-def add_edge(graph, vertex_a, vertex_b):
-    """
-    Add an edge to the graph between vertex_a and vertex_b.
-    
-    Parameters:
-        - graph (dict): The graph to which the edge should be added.
-        - vertex_a (tuple): One vertex of the edge.
-        - vertex_b (tuple): The other vertex of the edge.
-    """
-    graph[vertex_a].add(vertex_b)
-    graph[vertex_b].add(vertex_a)
-
-def build_graph(board_size: int) -> defaultdict:
-    """
-    Construct a graph based on a chessboard of given size.
-    
-    Parameters:
-        - board_size (int): Size of the side of the square chessboard.
-        
-    Returns:
-        - defaultdict: Graph representing legal moves on the chessboard.
-    """
-    graph = defaultdict(set)
-    for row in range(board_size):
-        for col in range(board_size):
-            for to_row, to_col in legal_moves_from(row, col, board_size):
-                add_edge(graph, (row, col), (to_row, to_col))
-    return graph
-
 def legal_moves_from(row: int, col: int, board_size: int) -> Tuple[int, int]:
     """
     Generator for all legal moves from a given position on the board.
@@ -61,73 +33,144 @@ def legal_moves_from(row: int, col: int, board_size: int) -> Tuple[int, int]:
         if 0 <= move_row < board_size and 0 <= move_col < board_size:
             yield move_row, move_col
 
-def warnsdorffs_heuristic(graph: defaultdict) -> callable:
+def build_neighbors(board_size: int) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Warnsdorff's heuristic for the knight's tour problem. Computes the degree of a vertex.
+    Construct the knight move table of a chessboard of given size.
     
     Parameters:
-        - graph (defaultdict): Graph representing the chessboard.
+        - board_size (int): Size of the side of the square chessboard.
         
     Returns:
-        - callable: A function that computes the degree of a vertex in the graph.
+        - np.ndarray: int16 array (squares, 8) with the neighbor squares row * board_size + col of every square, padded with -1.
+        - np.ndarray: int8 array with the number of neighbors of every square.
     """
-    def compute_degree(vertex):
-        return len(graph[vertex])
-    return compute_degree
+    neighbors = np.full((board_size * board_size, 8), -1, dtype=np.int16)
+    counts = np.zeros(board_size * board_size, dtype=np.int8)
+    for row in range(board_size):
+        for col in range(board_size):
+            vertex = row * board_size + col
+            for to_row, to_col in legal_moves_from(row, col, board_size):
+                neighbors[vertex, counts[vertex]] = to_row * board_size + to_col
+                counts[vertex] += 1
+    return neighbors, counts
+
+# Move table of the default 8x8 board, built once at import
+NEIGHBORS, NEIGHBOR_COUNTS = build_neighbors(8)
 
-def first_true(sequence: List[bool]) -> Optional[bool]:
+@njit(cache=True)
+def _sorted_candidates(vertex, visited, neighbors, counts, candidates, degrees):
     """
-    Returns the first True value in the sequence, or None if there isn't one.
+    Collect the unvisited neighbors of a vertex sorted by their number of onward moves (Warnsdorff's rule).
     
     Parameters:
-        - sequence (List[bool]): Sequence of boolean values.
+        - vertex (int): Current square.
+        - visited (np.ndarray): int8 array with 1 for every square on the path.
+        - neighbors (np.ndarray): int16 array (squares, 8) of neighbor squares, padded with -1.
+        - counts (np.ndarray): Number of neighbors of every square.
+        - candidates (np.ndarray): Output row of 8 squares.
+        - degrees (np.ndarray): Scratch row of 8 onward move counts.
         
     Returns:
-        - bool/None: The first True value or None.
+        - int: Number of candidates written.
     """
-    for item in sequence:
-        if item:
-            return item
-    return None
+    n = 0
+    for i in range(counts[vertex]):
+        candidate = neighbors[vertex, i]
+        if visited[candidate]:
+            continue
+        degree = 0
+        for j in range(counts[candidate]):
+            if not visited[neighbors[candidate, j]]:
+                degree += 1
+        # Insertion sort, ties keep the neighbor order
+        k = n
+        while k > 0 and degrees[k - 1] > degree:
+            candidates[k] = candidates[k - 1]
+            degrees[k] = degrees[k - 1]
+            k -= 1
+        candidates[k] = candidate
+        degrees[k] = degree
+        n += 1
+    return n
+
+@njit(cache=True)
+def _solve(neighbors, counts, start_vertex, total_squares):
+    """
+    Iterative depth-first search for a knight's tour using Warnsdorff's rule, compiled with Numba.
+    
+    Parameters:
+        - neighbors (np.ndarray): int16 array (squares, 8) of neighbor squares, padded with -1.
+        - counts (np.ndarray): Number of neighbors of every square.
+        - start_vertex (int): Square the tour starts from.
+        - total_squares (int): Number of squares on the board.
+        
+    Returns:
+        - np.ndarray: int16 array with the squares of the tour, empty if there is none.
+    """
+    visited = np.zeros(total_squares, np.int8)
+    path = np.empty(total_squares, np.int16)
+    # Sorted children of the square at every depth and the index of the next one to try
+    candidates = np.empty((total_squares, 8), np.int16)
+    num_candidates = np.zeros(total_squares, np.int8)
+    next_candidate = np.zeros(total_squares, np.int8)
+    degrees = np.empty(8, np.int8)
+
+    path[0] = start_vertex
+    visited[start_vertex] = 1
+    depth = 0
+    num_candidates[0] = _sorted_candidates(start_vertex, visited, neighbors, counts, candidates[0], degrees)
+    while depth + 1 < total_squares:
+        if next_candidate[depth] == num_candidates[depth]:
+            # Dead end, undo the move to the current square and backtrack
+            visited[path[depth]] = 0
+            depth -= 1
+            if depth < 0:
+                return path[:0]
+            continue
+
+        vertex = candidates[depth, next_candidate[depth]]
+        next_candidate[depth] += 1
+        depth += 1
+        path[depth] = vertex
+        visited[vertex] = 1
+        next_candidate[depth] = 0
+        num_candidates[depth] = _sorted_candidates(vertex, visited, neighbors, counts, candidates[depth], degrees)
+
+    return path
 
 def find_knights_tour(board_size: int = 8, 
                       start_row: int = 0, 
                       start_col: int = 0, 
-                      heuristic: callable = warnsdorffs_heuristic,
                       visualize: bool = True, 
                       output_filename_animation: str = 'animated_knight_tour.gif') -> List[Tuple[int, int]]:
     """
-    Finds a solution for the knight's tour problem using a given heuristic and visualizes the solution if specified.
+    Finds a solution for the knight's tour problem using Warnsdorff's rule and visualizes the solution if specified.
     
     Parameters:
         - board_size (int, optional): Size of the chessboard. Defaults to 8.
         - start_row (int, optional): Row of the starting position. Defaults to 0.
         - start_col (int, optional): Column of the starting position. Defaults to 0.
-        - heuristic (callable, optional): Heuristic function to use. Defaults to warnsdorffs_heuristic.
         - visualize (bool, optional): Whether to visualize the solution. Defaults to True.
         - output_filename_animation (str, optional): Filename for the saved animation. Defaults to 'animated_knight_tour.gif'.
         
     Returns:
-        - List[Tuple[int, int]]: A list of tuples representing the solution path.
+        - List[Tuple[int, int]]: A list of tuples representing the solution path, empty if there is none.
     """
-    graph = build_graph(board_size)
+    if board_size == 8:
+        neighbors, counts = NEIGHBORS, NEIGHBOR_COUNTS
+    else:
+        neighbors, counts = build_neighbors(board_size)
     total_squares = board_size * board_size
+    start_vertex = start_row * board_size + start_col
 
-    def traverse(path, current_vertex):
-        if len(path) + 1 == total_squares:
-            print("Found Knight's Tour")
-            return path + [current_vertex]
-
-        yet_to_visit = graph[current_vertex] - set(path)
-        if not yet_to_visit:
-            return False
+    path = _solve(neighbors, counts, start_vertex, total_squares).tolist()
 
-        next_vertices = sorted(yet_to_visit, key=heuristic(graph))
-        return first_true(
-            traverse(path + [current_vertex], vertex) for vertex in next_vertices
-        )
+    if len(path) != total_squares:
+        print("No Knight's Tour exists from this square")
+        return []
 
-    solution = traverse([], (start_row, start_col))
+    print("Found Knight's Tour")
+    solution = [divmod(vertex, board_size) for vertex in path]
     script_dir = os.path.dirname(os.path.abspath(__file__))
     output_path = os.path.join(script_dir + '/solutions', f"{board_size}x{board_size}_{start_row}-{start_col}.txt")
 
@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
 
 def parse_solution_from_file(filename):
     """
@@ -15,83 +14,86 @@ def parse_solution_from_file(filename):
     with open(filename, 'r') as f:
         return [tuple(map(int, line.split(','))) for line in f.readlines()]
 
-def plot_knight_tour(solution, output_filename='animated_knight_tour.gif'):
+def plot_knight_tour(solution, output_filename='animated_knight_tour.gif', image_size=800):
     """
     Plots and saves an animated GIF of the knight's tour based on the provided solution.
     
     Parameters:
         - solution (list[tuple[int, int]]): A list of coordinate pairs representing the knight's moves.
         - output_filename (str, optional): The filename for the saved GIF. Defaults to 'animated_knight_tour.gif'.
+        - image_size (int, optional): Approximate width and height of the GIF in pixels. Defaults to 800.
     """
     
     # Determine the size of the chessboard from the solution
     board_dimension = int(np.sqrt(len(solution)))
     
-    # Initialize the canvas with a margin around the chessboard
+    # Initialize the canvas with a margin around the chessboard. Squares hold indices into
+    # a fixed palette, so the GIF encoder does not have to quantize every frame.
+    white, black, green, dark_green = range(4)
+    palette = [255, 255, 255, 0, 0, 0, 0, 255, 0, 0, 128, 0]
     canvas_size = int(1.5 * board_dimension)
-    canvas = np.ones((canvas_size, canvas_size, 3))
+    canvas = np.full((canvas_size, canvas_size), white, dtype=np.uint8)
 
     # Calculate where the chessboard starts and ends on the canvas
     chessboard_start = (canvas_size - board_dimension) // 2
     chessboard_end = chessboard_start + board_dimension
 
     # Fill the canvas with alternating black and white squares
-    for i in range(chessboard_start, chessboard_end):
-        for j in range(chessboard_start, chessboard_end):
-            if (i + j) % 2:
-                canvas[i, j] = [0, 0, 0]  # Black square
+    rows, cols = np.indices((board_dimension, board_dimension))
+    chessboard = canvas[chessboard_start:chessboard_end, chessboard_start:chessboard_end]
+    chessboard[(rows + cols) % 2 == 1] = black
+
+    # Upscale the canvas so every square is cell x cell pixels
+    cell = max(image_size // canvas_size, 1)
+    image = Image.fromarray(canvas, mode='P').resize((canvas_size * cell, canvas_size * cell), Image.NEAREST)
+    image.putpalette(palette)
+    draw = ImageDraw.Draw(image)
+    label_font = ImageFont.load_default(size=max(cell // 4, 8))
+    title_font = ImageFont.load_default(size=max(cell // 3, 10))
+
+    def center(row, col):
+        return ((col + 0.5) * cell, (row + 0.5) * cell)
+
+    # Draw a rectangle around the chessboard
+    draw.rectangle([chessboard_start * cell - 2, chessboard_start * cell - 2,
+                    chessboard_end * cell + 1, chessboard_end * cell + 1], outline=black, width=2)
+
+    # Add labels for the rows and columns of the chessboard
+    letters = [chr(97 + i) for i in range(board_dimension)]
+    numbers = list(range(1, board_dimension + 1))
+    for i, letter in enumerate(letters):
+        x, _ = center(chessboard_start, chessboard_start + i)
+        draw.text((x, chessboard_end * cell + cell * 0.2), letter, fill=black, font=label_font, anchor='mt')
+        _, y = center(chessboard_end - 1 - i, chessboard_start)
+        draw.text((chessboard_start * cell - cell * 0.3, y), str(numbers[i]), fill=black, font=label_font, anchor='rm')
+
+    # Add title above the chessboard
+    starting_square = f"{letters[solution[0][1]]}{numbers[-solution[0][0]-1]}"
+    draw.text(((chessboard_start + board_dimension / 2) * cell, chessboard_start * cell - cell * 0.5),
+              f"Knight's Tour ({starting_square})", fill=black, font=title_font, anchor='mb',
+              stroke_width=1, stroke_fill=black)
 
     frames = []
 
     # Create frames for each move in the solution
     for index, coord in enumerate(solution):
-        fig, ax = plt.subplots(figsize=(8, 8))
-
-        # Color the path the knight has moved so far
-        for past_coord in solution[:index]:
-            x, y = past_coord
+        # Color the square the knight just left, the image keeps the rest of the path
+        if index > 0:
+            x, y = solution[index - 1]
             x += chessboard_start
             y += chessboard_start
-            if (x + y) % 2:  # Black square
-                canvas[x, y] = [0, 0.5, 0]  # Dark Green
-            else:  # White square
-                canvas[x, y] = [0, 1, 0]  # Green
+            path_color = dark_green if (x + y) % 2 else green  # Dark green on black squares
+            draw.rectangle([y * cell, x * cell, (y + 1) * cell - 1, (x + 1) * cell - 1], fill=path_color)
 
-        ax.imshow(canvas, origin='upper')
-        
-        # Mark the current position of the knight with a 'K'
-        k_y, k_x = coord
+        # Mark the current position of the knight with a 'K' on a copy of the board
+        frame = image.copy()
+        k_x, k_y = coord
         k_x += chessboard_start
         k_y += chessboard_start
-        ax.text(k_x, k_y, 'K', color='black' if (k_x + k_y) % 2 == 0 else 'white', 
-                ha='center', va='center', fontsize=12, fontweight='bold')
-
-        # Draw a rectangle around the chessboard
-        rect = plt.Rectangle((chessboard_start - 0.5, chessboard_start - 0.5), 
-                             board_dimension, board_dimension, fill=False, color='black', linewidth=2)
-        ax.add_patch(rect)
-
-        # Add labels for the rows and columns of the chessboard
-        letters = [chr(97 + i) for i in range(board_dimension)]
-        numbers = list(range(1, board_dimension + 1))
-        for i, letter in enumerate(letters):
-            ax.text(chessboard_start + i, chessboard_end + 0.2, letter, ha='center', va='bottom', fontsize=12)
-            ax.text(chessboard_start - 0.8, chessboard_end - 1 - i, str(numbers[i]), ha='right', va='center', fontsize=12)
-        
-        # Add title to the frame
-        starting_square = f"{letters[solution[0][1]]}{numbers[-solution[0][0]-1]}"
-        ax.text(chessboard_start + board_dimension/2 - 0.25, chessboard_start - 1.5, f"Knight's Tour ({starting_square})", ha='center', va='top', fontsize=14, fontweight='bold')
-
-        ax.axis('off')
-        fig.tight_layout(pad=0)
-
-        # Convert the current frame to an array and add it to the frames list
-        fig.canvas.draw()
-        frame = np.frombuffer(fig.canvas.buffer_rgba(), dtype=np.uint8).reshape(fig.canvas.get_width_height()[::-1] + (4,))
-        frames.append(frame[..., :3])
-
-        plt.close(fig)
+        color = black if (k_x + k_y) % 2 == 0 else white
+        ImageDraw.Draw(frame).text(center(k_x, k_y), 'K', fill=color, font=label_font, anchor='mm',
+                                   stroke_width=1, stroke_fill=color)
+        frames.append(frame)
 
     # Save the frames as an animated GIF
-    frames = [Image.fromarray(frame) for frame in frames]
     frames[0].save('animations/' + output_filename, save_all=True, append_images=frames[1:], duration=500, loop=0)